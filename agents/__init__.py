@@ -0,0 +1,23 @@
+"""
+Agent registry.
+Agents are referenced by import path and only loaded when the supervisor
+first dispatches to them, so importing this package stays cheap.
+"""
+import importlib
+
+AGENT_REGISTRY = {
+    "DataAgent": "agents.data_agent:DataAgent",
+    "IdeationAgent": "agents.ideation_agent:IdeationAgent",
+    "ContentAgent": "agents.content_agent:ContentAgent",
+    "ValidatorAgent": "agents.validator_agent:ValidatorAgent",
+}
+
+def load_agent_class(name):
+    """Imports and returns the agent class registered under `name`."""
+    module_path, class_name = AGENT_REGISTRY[name].split(":")
+    return getattr(importlib.import_module(module_path), class_name)
+
+def register_all(supervisor):
+    """Registers every known agent with the supervisor as a lazy factory."""
+    for name in AGENT_REGISTRY:
+        supervisor.register_lazy_agent(name, lambda state, name=name: load_agent_class(name)(state))
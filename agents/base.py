@@ -1,20 +1,16 @@
-import os
 import logging
-import google.generativeai as genai
 from core.state import SharedState
+from core.llm import get_backend
+from core.output_parser import OutputParseError, parse_json
+
+REPAIR_PROMPT = "The following output was meant to be a single valid JSON value but does not parse. Return ONLY the corrected JSON, nothing else.\n{output}"
 
 class BaseAgent:
     def __init__(self, name, state: SharedState):
         self.name = name
         self.state = state
-        
-        # Initialize Gemini
-        api_key = os.environ.get("GEMINI_API_KEY")
-        if api_key:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-1.5-flash') # User asked for 'gemini-flash-latest' but standard alias is safer, will try user string first
-        else:
-            self.model = None
+        # Providers load their SDK on first generate(), so this stays cheap.
+        self.backend = get_backend(state)
 
     def execute(self):
         """
@@ -22,28 +18,42 @@ class BaseAgent:
         """
         raise NotImplementedError("Subclasses must implement execute()")
 
-    def call_llm(self, prompt, json_mode=False):
-        """
-        Helper to call Gemini.
-        """
-        if not self.model:
-             # Try refreshing config if key was added late
-            api_key = os.environ.get("GEMINI_API_KEY")
-            if api_key:
-                genai.configure(api_key=api_key)
-                self.model = genai.GenerativeModel('gemini-flash-latest')
-            else:
-                self.state.set_error(f"{self.name}: No API Key. cannot generate.")
-                return None
+    def speculative_prompts(self):
+        """
+        (prompt, json_mode, task) tuples execute() is likely to send next,
+        so the supervisor can start them early. Empty by default.
+        """
+        return []
 
+    def call_llm(self, prompt, json_mode=False, task=None):
+        """
+        Helper to call the configured LLM backend.
+        """
         try:
-            generation_config = {}
-            if json_mode:
-                generation_config = {"response_mime_type": "application/json"}
-            
-            response = self.model.generate_content(prompt, generation_config=generation_config)
-            return response.text
-            
+            response = self.backend.generate(prompt, json_mode=json_mode, task=task, mission=self.state.mission_id)
         except Exception as e:
+            self.state.record_llm_usage(prompt, None)
             self.state.set_error(f"{self.name} LLM Error: {e}")
             return None
+        self.state.record_llm_usage(prompt, response)
+        return response
+
+    def call_llm_json(self, prompt, task=None, repair_attempts=1):
+        """
+        Calls the LLM in JSON mode and parses the result.
+        Locally repairable defects never cost a round-trip; otherwise only
+        the broken output (not the whole task prompt) is sent back for fixing.
+        Returns None on failure.
+        """
+        content = self.call_llm(prompt, json_mode=True, task=task)
+        for attempt in range(repair_attempts + 1):
+            if content is None:
+                return None
+            try:
+                return parse_json(content)
+            except OutputParseError as e:
+                if attempt == repair_attempts:
+                    self.state.set_error(f"{self.name}: Invalid JSON for {task}: {e}")
+                    return None
+                self.state.log_event(self.name, f"Malformed JSON for {task}, requesting repair...")
+                content = self.call_llm(REPAIR_PROMPT.format(output=content), json_mode=True, task=f"{task}_repair")
@@ -1,80 +1,108 @@
 import json
 from agents.base import BaseAgent
+from core.knowledge import get_knowledge_index
+
+def merge_faqs(known, generated):
+    """Known answers win; generated items are added unless already asked."""
+    seen = {item["question"].strip().lower() for item in known}
+    merged = list(known)
+    for item in generated:
+        question = item.get("question", "") if isinstance(item, dict) else ""
+        if question and question.strip().lower() not in seen:
+            seen.add(question.strip().lower())
+            merged.append(item)
+    return merged
 
 class ContentAgent(BaseAgent):
     def __init__(self, state):
         super().__init__("ContentAgent", state)
 
+    def _product_name(self):
+        return (self.state.get_context("glowboost_data") or {}).get("product_name")
+
+    def faq_questions(self):
+        """Flat list of questions from the categorized ideation output."""
+        structured = self.state.get_context("structured_faqs") or {}
+        questions = []
+        for category in structured.get("categories", []) if isinstance(structured, dict) else []:
+            questions.extend(q for q in category.get("questions", []) if isinstance(q, str))
+        return questions
+
+    def split_known_faqs(self):
+        """Returns (answered FAQ items, questions still needing the LLM)."""
+        index = get_knowledge_index()
+        answered, pending = [], []
+        for question in self.faq_questions():
+            answer = index.answer(question, product=self._product_name())
+            if answer:
+                answered.append({"question": question, "answer": answer})
+            else:
+                pending.append(question)
+        return answered, pending
+
+    def faq_prompt(self, questions=None):
+        if not questions:
+            faqs = self.state.get_context("structured_faqs")
+            glow_data = self.state.get_context("glowboost_data")
+            return f"Create FAQ JSON from {json.dumps(faqs)} using info {json.dumps(glow_data)}. JSON: {{ 'faqs': [ {{ 'question': '...', 'answer': '...' }} ] }}"
+        facts = get_knowledge_index().snippets(" ".join(questions), k=5, product=self._product_name())
+        return (
+            f"Answer these customer questions about {self._product_name()} using ONLY these facts.\n"
+            f"Questions: {json.dumps(questions)}\nFacts:\n" + "\n".join(f"- {fact}" for fact in facts) +
+            "\nJSON: { 'faqs': [ { 'question': '...', 'answer': '...' } ] }"
+        )
+
+    def product_page_prompt(self):
+        glow_data = self.state.get_context("glowboost_data")
+        return f"Create Product Page JSON for {json.dumps(glow_data)}. Structure: meta, hero_section, specifications."
+
+    def comparison_prompt(self):
+        comp = self.state.get_context("competitor_data")
+        return f"Compare GlowBoost vs {comp.get('name')}. JSON: {{ 'comparison_points': [...] }}"
+
+    def speculative_prompts(self):
+        # Only speculate on prompts whose inputs already exist; anything else
+        # would differ from what execute() sends and just burn quota.
+        artifacts = self.state.get_all()["artifacts"]
+        glow_data = self.state.get_context("glowboost_data")
+        prompts = []
+        if "faq.json" not in artifacts and self.state.get_context("structured_faqs") and glow_data:
+            answered, pending = self.split_known_faqs()
+            if pending or not answered:
+                prompts.append((self.faq_prompt(pending), True, "faq"))
+        if "product_page.json" not in artifacts and glow_data:
+            prompts.append((self.product_page_prompt(), True, "product_page"))
+        if "comparison_page.json" not in artifacts and self.state.get_context("competitor_data"):
+            prompts.append((self.comparison_prompt(), True, "comparison"))
+        return prompts
+
     def execute(self):
         self.state.log_event(self.name, "Starting content assembly...")
-        
-        sim_mode = self.state.get_context("simulation_mode")
 
         # 1. Build FAQ JSON
         if "faq.json" not in self.state.get_all()["artifacts"]:
             self.state.log_event(self.name, "Building FAQ JSON...")
-            if sim_mode:
-                faq_data = {
-                    "faqs": [
-                        {"question": "How often should I use it?", "answer": "For best results, apply GlowBoost Vitamin C Serum every morning after cleansing."},
-                        {"question": "Is it safe for sensitive skin?", "answer": "Yes, GlowBoost is formulated with soothing ingredients like Vitamin E and is suitable for sensitive skin."},
-                        {"question": "Can I use it with Retinol?", "answer": "We recommend using Vitamin C in the morning and Retinol at night to avoid irritation."}
-                    ]
-                }
-                self.state.save_artifact("faq.json", faq_data)
-            else:
-                # Real Logic
-                faqs = self.state.get_context("structured_faqs")
-                glow_data = self.state.get_context("glowboost_data")
-                prompt = f"Create FAQ JSON from {json.dumps(faqs)} using info {json.dumps(glow_data)}. JSON: {{ 'faqs': [ {{ 'question': '...', 'answer': '...' }} ] }}"
-                content = self.call_llm(prompt, json_mode=True)
-                if content:
-                    self.state.save_artifact("faq.json", json.loads(content))
+            faq_items, pending = self.split_known_faqs()
+            if faq_items:
+                self.state.log_event(self.name, f"Answered {len(faq_items)} FAQs from the knowledge index.")
+            if pending or not faq_items:
+                data = self.call_llm_json(self.faq_prompt(pending), task="faq")
+                faq_items = merge_faqs(faq_items, data.get("faqs", [])) if isinstance(data, dict) else None
+            if faq_items:
+                self.state.save_artifact("faq.json", {"faqs": faq_items})
 
         # 2. Build Product Page JSON
         if "product_page.json" not in self.state.get_all()["artifacts"]:
             self.state.log_event(self.name, "Building Product Page JSON...")
-            if sim_mode:
-                pp_data = {
-                    "meta": {"title": "GlowBoost | Radiance Defined", "description": "Experience the power of 20% Vitamin C."},
-                    "hero_section": {
-                        "headline": "Unlock Your Inner Radiance",
-                        "subheadline": "Advanced Vitamin C therapy for brighter, smoother skin.",
-                        "call_to_action": "Shop Now",
-                        "key_benefits": ["Brightens Complexion", "Fades Dark Spots", "Daily Protection"]
-                    },
-                    "specifications": {
-                        "volume": "30ml / 1.0 fl oz",
-                        "price": 29.99,
-                        "ingredients": ["Aqua", "Ascorbic Acid (20%)", "Tocopherol (Vitamin E)", "Ferulic Acid", "Hyaluronic Acid"]
-                    }
-                }
-                self.state.save_artifact("product_page.json", pp_data)
-            else:
-                glow_data = self.state.get_context("glowboost_data")
-                prompt = f"Create Product Page JSON for {json.dumps(glow_data)}. Structure: meta, hero_section, specifications."
-                content = self.call_llm(prompt, json_mode=True)
-                if content:
-                    self.state.save_artifact("product_page.json", json.loads(content))
+            data = self.call_llm_json(self.product_page_prompt(), task="product_page")
+            if data:
+                self.state.save_artifact("product_page.json", data)
 
         # 3. Build Comparison JSON
         if "comparison_page.json" not in self.state.get_all()["artifacts"]:
             self.state.log_event(self.name, "Building Comparison JSON...")
-            if sim_mode:
-                comp_data = {
-                    "comparison_points": [
-                        {"feature": "Vitamin C Conc.", "glowboost": "20%", "competitor": "15%"},
-                        {"feature": "Price", "glowboost": "$29.99", "competitor": "$45.00"},
-                        {"feature": "Cruelty-Free", "glowboost": "Yes", "competitor": "No"}
-                    ]
-                }
-                self.state.save_artifact("comparison_page.json", comp_data)
-            else:
-                glow_data = self.state.get_context("glowboost_data")
-                comp = self.state.get_context("competitor_data")
-                prompt = f"Compare GlowBoost vs {comp.get('name')}. JSON: {{ 'comparison_points': [...] }}"
-                content = self.call_llm(prompt, json_mode=True)
-                if content:
-                    self.state.save_artifact("comparison_page.json", json.loads(content))
+            data = self.call_llm_json(self.comparison_prompt(), task="comparison")
+            if data:
+                self.state.save_artifact("comparison_page.json", data)
         
         self.state.log_event(self.name, "All artifacts assembled.")
@@ -20,18 +20,11 @@ class DataAgent(BaseAgent):
         
         # 2. Generate Competitor Data
         if not self.state.get_context("competitor_data"):
-            if self.state.get_context("simulation_mode"):
-                self.state.log_event(self.name, "[Sim] Generating competitor data...")
-                competitor_name = "LuminaEssence Brightening Drops"
-                self.state.update_context("competitor_data", {"name": competitor_name})
-                self.state.log_event(self.name, f"Generated Competitor: {competitor_name}")
+            self.state.log_event(self.name, "Generating competitor data...")
+            prompt = "Generate a fictional competitor product to 'GlowBoost Vitamin C Serum'. Return ONLY the name."
+            competitor_name = self.call_llm(prompt, task="competitor")
+            if competitor_name:
+                self.state.update_context("competitor_data", {"name": competitor_name.strip()})
+                self.state.log_event(self.name, f"Generated Competitor: {competitor_name.strip()}")
             else:
-                # Real LLM Call
-                self.state.log_event(self.name, "Generating competitor data...")
-                prompt = "Generate a fictional competitor product to 'GlowBoost Vitamin C Serum'. Return ONLY the name."
-                competitor_name = self.call_llm(prompt)
-                if competitor_name:
-                    self.state.update_context("competitor_data", {"name": competitor_name.strip()})
-                    self.state.log_event(self.name, f"Generated Competitor: {competitor_name.strip()}")
-                else:
-                    self.state.log_event(self.name, "Failed to generate competitor.")
+                self.state.log_event(self.name, "Failed to generate competitor.")
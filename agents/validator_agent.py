@@ -1,19 +1,12 @@
 import json
 from agents.base import BaseAgent
+from core.output_parser import OutputParseError, parse_json
 
 class ValidatorAgent(BaseAgent):
     def __init__(self, state):
         super().__init__("ValidatorAgent", state)
 
     def execute(self):
-        if self.state.get_context("simulation_mode"):
-            self.state.log_event(self.name, "[Sim] Validating artifacts...")
-            # Simulate a "Pass"
-            self.state.update_context("validation_report", "PASS")
-            self.state.log_event(self.name, "Validation Successful (Simulation).")
-            return
-
-        # Real Logic
         self.state.log_event(self.name, "Validating artifacts...")
         artifacts = self.state.get_all()["artifacts"]
         
@@ -29,12 +22,19 @@ class ValidatorAgent(BaseAgent):
         Return JSON: {{ "status": "PASS" or "FAIL", "critique": "..." }}
         """
         
-        response = self.call_llm(prompt, json_mode=True)
-        if response:
-            try:
-                data = json.loads(response)
-                status = data.get("status", "FAIL")
-                self.state.update_context("validation_report", status)
-                self.state.log_event(self.name, f"Validation {status}: {data.get('critique', 'No critique')}")
-            except:
-                self.state.update_context("validation_report", "FAIL")
+        content = self.call_llm(prompt, json_mode=True, task="validation")
+        if content is None:
+            # The call itself failed (quota, network): no verdict, so the
+            # supervisor can retry instead of treating it as a FAIL.
+            return
+        try:
+            data = parse_json(content)
+        except OutputParseError as e:
+            data = None
+            self.state.set_error(f"{self.name}: Invalid JSON for validation: {e}")
+        if isinstance(data, dict):
+            status = data.get("status", "FAIL")
+            self.state.update_context("validation_report", status)
+            self.state.log_event(self.name, f"Validation {status}: {data.get('critique', 'No critique')}")
+        else:
+            self.state.update_context("validation_report", "FAIL")
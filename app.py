@@ -1,21 +1,18 @@
 import streamlit as st
-import streamlit.components.v1 as components
 import json
 import os
 import time
 import html
-import textwrap
-from dotenv import load_dotenv
 
 # Core Imports
 from core.state import SharedState
 from core.orchestrator import ApexSupervisor
+from core.llm import LLMError, get_backend
+from core.exporter import ArtifactExporter, mission_dir, prune_exports
+from core.preview import render_product_preview
 
-# Agent Imports
-from agents.data_agent import DataAgent
-from agents.ideation_agent import IdeationAgent
-from agents.content_agent import ContentAgent
-from agents.validator_agent import ValidatorAgent
+# Agents are loaded lazily through the registry on first dispatch
+from agents import register_all
 
 # --- Configuration ---
 st.set_page_config(
@@ -24,7 +21,26 @@ st.set_page_config(
     layout="wide",
 )
 
-load_dotenv()
+@st.cache_resource
+def load_env():
+    # Read .env once per process instead of on every rerun
+    from dotenv import load_dotenv
+    load_dotenv()
+    return True
+
+load_env()
+
+# Script runs in this session (tools/loadtest.py reads it to measure reruns)
+st.session_state.script_runs = st.session_state.get("script_runs", 0) + 1
+
+# --- Render Caches (keyed on artifact content hash; "_" args are not hashed) ---
+@st.cache_data(max_entries=32)
+def cached_preview_html(fingerprint, _product_page):
+    return render_product_preview(_product_page)
+
+@st.cache_data(max_entries=64)
+def cached_json_text(fingerprint, _artifact):
+    return json.dumps(_artifact, indent=2)
 
 # --- Custom CSS (Refined Geometric Dark) ---
 st.markdown("""
@@ -159,14 +175,21 @@ with st.sidebar:
     # SIMULATION MODE TOGGLE
     sim_mode = st.toggle("Enable Simulation Mode", value=False, help="Run without API Key using pre-calculated data.")
     
+    live_backend = None
     if not sim_mode:
-        # Persistent API Key Input (GEMINI)
-        api_key_input = st.text_input("Gemini API Key", type="password")
-        
-        if api_key_input:
-            os.environ["GEMINI_API_KEY"] = api_key_input
-        elif "GEMINI_API_KEY" in os.environ:
-            del os.environ["GEMINI_API_KEY"]
+        try:
+            live_backend = get_backend()
+        except LLMError as e:
+            st.error(f"⚠️ LLM backend error: {e}")
+
+        # Persistent API Key Input for the configured provider
+        if live_backend and live_backend.api_key_env:
+            api_key_input = st.text_input(f"API Key ({live_backend.api_key_env})", type="password")
+            
+            if api_key_input:
+                os.environ[live_backend.api_key_env] = api_key_input
+            elif live_backend.api_key_env in os.environ:
+                del os.environ[live_backend.api_key_env]
     else:
         st.info("⚡ Running in Simulation Mode. No API Key required.")
     
@@ -199,9 +222,11 @@ col_btn, col_space = st.columns([1, 4])
 with col_btn:
     if st.button("🚀 Start Mission", type="primary"):
         # Validation Logic
-        if not sim_mode and not os.environ.get("GEMINI_API_KEY"):
-            st.error("⚠️ Missing Gemini API Key.")
-            st.toast("Please enter your Gemini API Key or Enable Simulation Mode.", icon="⚠️")
+        if not sim_mode and not live_backend:
+            st.error("⚠️ No usable LLM backend. Check LLM_PROVIDER or Enable Simulation Mode.")
+        elif not sim_mode and not live_backend.is_available():
+            st.error(f"⚠️ Missing {live_backend.api_key_env} for the '{live_backend.name}' backend.")
+            st.toast(f"Please enter your {live_backend.name} API Key or Enable Simulation Mode.", icon="⚠️")
         else:
             # Re-initialize
             st.session_state.shared_state = SharedState()
@@ -209,13 +234,17 @@ with col_btn:
             
             # Update Context with Sim Mode
             state.update_context("simulation_mode", sim_mode)
+
+            # Stream artifacts to disk as they are saved
+            export_dir = os.environ.get("EXPORT_DIR", "exports")
+            exporter = ArtifactExporter(mission_dir(export_dir, state.mission_id), compression=os.environ.get("EXPORT_COMPRESSION") or None)
+            prune_exports(export_dir, max_age=float(os.environ.get("EXPORT_TTL_HOURS", "24")) * 3600)
+            exporter.attach(state)
+            st.session_state.exporter = exporter
             
             # Re-init Supervisor/Agents
             supervisor = ApexSupervisor(state)
-            supervisor.register_agent("DataAgent", DataAgent(state))
-            supervisor.register_agent("IdeationAgent", IdeationAgent(state))
-            supervisor.register_agent("ContentAgent", ContentAgent(state))
-            supervisor.register_agent("ValidatorAgent", ValidatorAgent(state))
+            register_all(supervisor)
             
             st.session_state.is_running = True
             st.rerun()
@@ -248,15 +277,12 @@ with st.container():
 if st.session_state.is_running:
     # RE-INITIALIZE Agents
     supervisor = ApexSupervisor(state)
-    supervisor.register_agent("DataAgent", DataAgent(state))
-    supervisor.register_agent("IdeationAgent", IdeationAgent(state))
-    supervisor.register_agent("ContentAgent", ContentAgent(state))
-    supervisor.register_agent("ValidatorAgent", ValidatorAgent(state)) 
+    register_all(supervisor)
 
     with st.spinner("Agents working..."):
         keep_going = supervisor.run_step()
     
-    time.sleep(1.0) 
+    time.sleep(float(os.environ.get("APEX_STEP_DELAY", "1.0")))
     
     if not keep_going:
         st.session_state.is_running = False
@@ -271,119 +297,30 @@ if state.get_context("validation_report"):
 
     if state.get_context("validation_report") == "PASS":
         artifacts = state.get_all()["artifacts"]
+
+        # Archive is built once per set of artifacts, not on every rerun
+        if "exporter" in st.session_state:
+            st.download_button("⬇️ Download All Artifacts", st.session_state.exporter.build_archive(), "artifacts.zip", "application/zip")
         
         tab1, tab2, tab3, tab4 = st.tabs(["👁️ Product Page Preview", "📄 Product JSON", "❓ FAQ JSON", "⚖️ Comparison JSON"])
         
         with tab1:
             pp = artifacts.get("product_page.json", {})
             if pp:
-                # FIX: Access call_to_action correctly from nested hero_section
-                cta = pp.get('hero_section', {}).get('call_to_action', 'Buy Now')
-                
-                preview_html = f"""
-                    <html>
-                    <head>
-                    <style>
-                        @import url('https://fonts.googleapis.com/css2?family=Outfit:wght@300;500;700&display=swap');
-                        body {{
-                            font-family: 'Outfit', sans-serif;
-                            background-color: #151515;
-                            color: #EEE;
-                            padding: 2rem;
-                            margin: 0;
-                        }}
-                        .container {{
-                            max-width: 1000px;
-                            margin: 0 auto;
-                            border: 1px solid #333;
-                            border-radius: 12px;
-                            background: #151515;
-                            padding: 3rem;
-                            box-shadow: 0 10px 30px rgba(0,0,0,0.5);
-                        }}
-                        h1 {{ color: #FF8800; font-size: 3rem; margin: 0.5rem 0; letter-spacing: -1px; }}
-                        h2 {{ color: #FFF; font-size: 3.5rem; margin: 1.5rem 0; line-height: 1.2; }}
-                        h3 {{ color: #FF8800; margin-top: 0; }}
-                        .btn {{
-                            display: inline-block;
-                            background: #FF8800;
-                            color: #000;
-                            padding: 15px 40px;
-                            border-radius: 50px;
-                            font-size: 1.2rem;
-                            font-weight: 800;
-                            cursor: pointer;
-                            box-shadow: 0 0 20px rgba(255,136,0,0.4);
-                            text-decoration: none;
-                        }}
-                        .grid {{
-                            display: grid;
-                            grid-template-columns: 1fr 1fr;
-                            gap: 3rem;
-                            margin-top: 2rem;
-                        }}
-                        .card {{
-                            background: #202020;
-                            padding: 2rem;
-                            border-radius: 12px;
-                            border: 1px solid #333;
-                        }}
-                        ul {{ line-height: 1.8; color: #DDD; padding-left: 1.2rem; }}
-                        strong {{ color: #FFF; }}
-                    </style>
-                    </head>
-                    <body>
-                        <div class="container">
-                            <div style="text-align: center; border-bottom: 1px solid #333; padding-bottom: 2rem; margin-bottom: 2rem;">
-                                <div style="font-size: 0.9rem; text-transform: uppercase; letter-spacing: 2px; color: #888; margin-bottom: 1rem;">Official Store</div>
-                                <h1>{pp.get('meta', {}).get('title')}</h1>
-                                <p style="color: #AAA; font-size: 1.2rem; max-width: 600px; margin: 0 auto;">{pp.get('meta', {}).get('description')}</p>
-                            </div>
-                            
-                            <div style="text-align: center; margin-bottom: 4rem;">
-                                <h2>{pp.get('hero_section', {}).get('headline')}</h2>
-                                <a class="btn">
-                                    {cta} — ${pp.get('specifications', {}).get('price')}
-                                </a>
-                            </div>
-                            
-                            <div class="grid">
-                                <div class="card">
-                                    <h3>✨ Key Benefits</h3>
-                                    <ul>
-                                        {"".join([f"<li>{item}</li>" for item in pp.get('hero_section', {}).get('key_benefits', [])])}
-                                    </ul>
-                                </div>
-                                <div class="card">
-                                    <h3>🔬 Specifications</h3>
-                                    <p style="margin-bottom: 1rem;"><strong>Volume:</strong> <span style="color: #AAA;">{pp.get('specifications', {}).get('volume')}</span></p>
-                                    <div>
-                                        <strong>Ingredients:</strong>
-                                        <div style="margin-top: 0.5rem; color: #AAA; font-size: 0.95rem; line-height: 1.6;">
-                                            {", ".join(pp.get('specifications', {}).get('ingredients', []))}
-                                        </div>
-                                    </div>
-                                </div>
-                            </div>
-                        </div>
-                    </body>
-                    </html>
-                """
+                preview_html = cached_preview_html(state.artifact_fingerprint("product_page.json"), pp)
+                import streamlit.components.v1 as components
                 components.html(preview_html, height=1000, scrolling=True)
             else:
                 st.warning("Product page artifact missing.")
 
         with tab2:
-            st.download_button("⬇️ Download JSON", json.dumps(artifacts.get("product_page.json"), indent=2), "product_page.json", "application/json")
-            st.json(artifacts.get("product_page.json"))
+            st.json(cached_json_text(state.artifact_fingerprint("product_page.json"), artifacts.get("product_page.json")))
         
         with tab3:
-            st.download_button("⬇️ Download JSON", json.dumps(artifacts.get("faq.json"), indent=2), "faq.json", "application/json")
-            st.json(artifacts.get("faq.json"))
+            st.json(cached_json_text(state.artifact_fingerprint("faq.json"), artifacts.get("faq.json")))
 
         with tab4:
-            st.download_button("⬇️ Download JSON", json.dumps(artifacts.get("comparison_page.json"), indent=2), "comparison_page.json", "application/json")
-            st.json(artifacts.get("comparison_page.json"))
+            st.json(cached_json_text(state.artifact_fingerprint("comparison_page.json"), artifacts.get("comparison_page.json")))
             
     elif state.get_context("validation_report") == "FAIL":
         st.error("Trace Validation Failed. Check logs for critique.")
@@ -0,0 +1,189 @@
+"""
+Artifact Exporter.
+Streams artifacts into sharded NDJSON files as they are saved, with optional
+gzip/zstd compression and an append-only manifest index
+(product id -> shard, offset). Nothing is held in memory beyond counters.
+Each mission gets its own directory; old ones are pruned by prune_exports().
+"""
+import gzip
+import io
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+import weakref
+import zipfile
+
+MANIFEST_NAME = "manifest.jsonl"
+_EXTENSIONS = {None: "", "gzip": ".gz", "zstd": ".zst"}
+_MISSION_DIR_RE = re.compile(r"^\d{8}-\d{6}-[0-9a-f]{8}$")
+# Directories of exporters still alive in this process; never pruned
+_active_dirs = set()
+
+
+def slugify(text):
+    return re.sub(r"[^a-z0-9]+", "-", str(text).lower()).strip("-") or "product"
+
+
+def mission_dir(base_dir, mission_id=None):
+    """
+    Unique export directory for one mission, named <start time>-<id> so
+    missions started in the same second never share shards.
+    """
+    suffix = (mission_id or uuid.uuid4().hex)[:8]
+    return os.path.join(base_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{suffix}")
+
+
+def _last_modified(path):
+    """Newest mtime of a directory or anything directly in it (appends don't touch the dir)."""
+    with os.scandir(path) as entries:
+        return max([os.path.getmtime(path)] + [entry.stat().st_mtime for entry in entries])
+
+
+def prune_exports(base_dir, max_age):
+    """
+    Deletes mission directories in base_dir not modified for `max_age`
+    seconds. Only directories named by mission_dir() are touched, and never
+    one an exporter in this process is still writing to; max_age <= 0
+    disables pruning. Returns the number of directories removed.
+    """
+    if max_age <= 0 or not os.path.isdir(base_dir):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for name in os.listdir(base_dir):
+        path = os.path.join(base_dir, name)
+        if not _MISSION_DIR_RE.match(name) or os.path.abspath(path) in _active_dirs:
+            continue
+        try:
+            if not os.path.isdir(path) or _last_modified(path) >= cutoff:
+                continue
+        except OSError:
+            continue  # Removed concurrently
+        shutil.rmtree(path, ignore_errors=True)
+        removed += 1
+    return removed
+
+
+def _open_append(path, compression):
+    if compression == "gzip":
+        return gzip.open(path, "ab")
+    return open(path, "ab")
+
+
+def _open_read(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".zst"):
+        import zstandard
+        raw = open(path, "rb")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True))
+    return open(path, "rb")
+
+
+class ArtifactExporter:
+    """
+    Appends one NDJSON record per artifact to the current shard and rotates
+    to a new shard every `shard_size` records. Manifest offsets are byte
+    offsets into the uncompressed shard stream.
+    """
+
+    def __init__(self, out_dir, shard_size=1000, compression=None):
+        if compression not in _EXTENSIONS:
+            raise ValueError(f"Unsupported compression '{compression}'.")
+        if compression == "zstd":
+            import zstandard  # Fail early if the optional dependency is missing
+            self._zstd = zstandard.ZstdCompressor()
+        self.out_dir = out_dir
+        self.shard_size = shard_size
+        self.compression = compression
+        self.records = 0
+        self._shard_index = 0
+        self._shard_records = 0
+        self._shard_offset = 0
+        self._archive = None
+        self._lock = threading.Lock()
+        os.makedirs(out_dir, exist_ok=True)
+        active = os.path.abspath(out_dir)
+        _active_dirs.add(active)
+        weakref.finalize(self, _active_dirs.discard, active)
+
+    def _shard_name(self):
+        return f"artifacts-{self._shard_index:05d}.ndjson{_EXTENSIONS[self.compression]}"
+
+    def write(self, product_id, artifact, data):
+        """Streams a single artifact to disk and indexes it."""
+        line = (json.dumps({"product_id": product_id, "artifact": artifact, "data": data}, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            if self._shard_records >= self.shard_size:
+                self._shard_index += 1
+                self._shard_records = 0
+                self._shard_offset = 0
+            shard = self._shard_name()
+            path = os.path.join(self.out_dir, shard)
+            if not os.path.isdir(self.out_dir):
+                # Deleted externally: start the shard (and its offsets) over
+                os.makedirs(self.out_dir, exist_ok=True)
+                self._shard_records = 0
+                self._shard_offset = 0
+            if self.compression == "zstd":
+                with open(path, "ab") as f:
+                    f.write(self._zstd.compress(line))
+            else:
+                with _open_append(path, self.compression) as f:
+                    f.write(line)
+            entry = {"product_id": product_id, "artifact": artifact, "shard": shard, "offset": self._shard_offset}
+            with open(os.path.join(self.out_dir, MANIFEST_NAME), "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._shard_offset += len(line)
+            self._shard_records += 1
+            self.records += 1
+            self._archive = None
+
+    def export_all(self, records):
+        """One-pass bulk export of an iterable of (product_id, artifact, data)."""
+        for product_id, artifact, data in records:
+            self.write(product_id, artifact, data)
+        return self.records
+
+    def attach(self, state, product_id=None):
+        """Streams every artifact `state` saves from now on."""
+        def on_save(key, value):
+            pid = product_id or slugify((state.get_context("glowboost_data") or {}).get("product_name", "product"))
+            self.write(pid, key, value)
+        state.add_artifact_listener(on_save)
+
+    def build_archive(self):
+        """Zip of all shards plus the manifest, rebuilt only after new writes."""
+        with self._lock:
+            if self._archive is None:
+                buffer = io.BytesIO()
+                with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED if not self.compression else zipfile.ZIP_STORED) as zf:
+                    names = os.listdir(self.out_dir) if os.path.isdir(self.out_dir) else []
+                    for name in sorted(names):
+                        zf.write(os.path.join(self.out_dir, name), name)
+                self._archive = buffer.getvalue()
+            return self._archive
+
+
+def load_manifest(out_dir):
+    """Returns {product_id: [{artifact, shard, offset}, ...]}."""
+    index = {}
+    with open(os.path.join(out_dir, MANIFEST_NAME), encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            index.setdefault(entry.pop("product_id"), []).append(entry)
+    return index
+
+
+def read_record(out_dir, shard, offset):
+    """Reads the record at `offset` in `shard` without loading the whole shard."""
+    with _open_read(os.path.join(out_dir, shard)) as f:
+        if f.seekable():
+            f.seek(offset)
+        else:
+            f.read(offset)
+        return json.loads(f.readline())
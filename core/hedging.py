@@ -0,0 +1,154 @@
+"""
+Hedged & Speculative LLM Requests.
+Cuts tail latency by duplicating calls that run past a recent-latency
+percentile, and lets the supervisor start a likely next prompt early.
+Both are capped so they never blow through quota.
+"""
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from core.llm import LLMBackend
+from core.recorder import prompt_hash
+
+
+class HedgeBudget:
+    """Allows at most `burst + ratio * calls` duplicate requests."""
+
+    def __init__(self, ratio=0.1, burst=2):
+        self.ratio = ratio
+        self.burst = burst
+        self.calls = 0
+        self.spent = 0
+        self._lock = threading.Lock()
+
+    def record_call(self):
+        with self._lock:
+            self.calls += 1
+
+    def try_spend(self):
+        with self._lock:
+            if self.spent < self.burst + self.ratio * self.calls:
+                self.spent += 1
+                return True
+            return False
+
+
+class HedgedBackend(LLMBackend):
+    """
+    Wraps another backend.
+    A call that is still pending after the `percentile` of recent latencies
+    for its task gets one duplicate; whichever succeeds first wins. Primary
+    calls start on their own thread right away, so time spent queueing never
+    looks like a slow call; only duplicates and prefetches use the pool.
+    Prefetched prompts are kept as futures, per mission, and handed over when
+    that mission requests the same prompt.
+    """
+
+    def __init__(self, inner, hedge=True, percentile=0.95, min_samples=10, window=100,
+                 budget=None, max_prefetched=8, max_missions=256, max_workers=8):
+        self.inner = inner
+        self.hedge = hedge
+        self.name = inner.name
+        self.offline = inner.offline
+        self.api_key_env = inner.api_key_env
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.budget = budget or HedgeBudget()
+        self.max_prefetched = max_prefetched  # Per mission
+        self.max_missions = max_missions
+        self._latencies = defaultdict(lambda: deque(maxlen=window))  # task -> recent latencies
+        self._prefetched = OrderedDict()  # mission -> OrderedDict(prompt hash -> future)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-hedge")
+
+    def is_available(self):
+        return self.inner.is_available()
+
+    def last_latency(self):
+        # Prefetched responses were computed earlier; report that call's duration
+        return getattr(self._local, "latency", None)
+
+    def _timed_call(self, prompt, json_mode, task, mission):
+        """Returns (response, seconds the upstream call took)."""
+        start = time.perf_counter()
+        response = self.inner.generate(prompt, json_mode=json_mode, task=task, mission=mission)
+        latency = time.perf_counter() - start
+        with self._lock:
+            self._latencies[task].append(latency)
+        return response, latency
+
+    def _start_now(self, *args):
+        """Runs _timed_call on a new thread, so it never waits for a pool worker."""
+        future = Future()
+
+        def run():
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(self._timed_call(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name="llm-primary", daemon=True).start()
+        return future
+
+    def hedge_threshold(self, task=None):
+        """Seconds to wait before hedging `task`, or None until enough samples exist."""
+        with self._lock:
+            samples = self._latencies.get(task)
+            if not self.hedge or not samples or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        return ordered[int(self.percentile * (len(ordered) - 1))]
+
+    def _first_success(self, futures):
+        pending = set(futures)
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def prefetch(self, prompt, json_mode=False, task=None, mission=None):
+        key = prompt_hash(prompt, json_mode)
+        with self._lock:
+            pending = self._prefetched.setdefault(mission, OrderedDict())
+            self._prefetched.move_to_end(mission)
+            if key in pending:
+                return False
+            pending[key] = self._pool.submit(self._timed_call, prompt, json_mode, task, mission)
+            while len(pending) > self.max_prefetched:
+                pending.popitem(last=False)
+            while len(self._prefetched) > self.max_missions:
+                self._prefetched.popitem(last=False)
+        self.budget.record_call()
+        return True
+
+    def generate(self, prompt, json_mode=False, task=None, mission=None):
+        self._local.latency = None
+        with self._lock:
+            pending = self._prefetched.get(mission)
+            speculative = pending.pop(prompt_hash(prompt, json_mode), None) if pending else None
+        if speculative is not None:
+            try:
+                response, self._local.latency = speculative.result()
+                return response
+            except Exception:
+                pass  # Fall through to a regular call
+
+        self.budget.record_call()
+        threshold = self.hedge_threshold(task)
+        if threshold is None:
+            return self._timed_call(prompt, json_mode, task, mission)[0]
+
+        primary = self._start_now(prompt, json_mode, task, mission)
+        done, _ = wait([primary], timeout=threshold)
+        if done or not self.budget.try_spend():
+            return primary.result()[0]
+        hedge = self._pool.submit(self._timed_call, prompt, json_mode, task, mission)
+        return self._first_success([primary, hedge])[0]
@@ -0,0 +1,120 @@
+"""
+Knowledge Index for Grounding.
+A BM25 inverted index over every product file in library/ (ingredients,
+claims, usage, safety warnings and FAQ pairs). Questions matching a known
+one exactly are answered straight from `faqs_raw`; everything else gets
+only the top-k snippets.
+"""
+import glob
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+LIBRARY_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "library")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from", "how",
+    "i", "if", "in", "is", "it", "its", "me", "my", "of", "on", "or", "should", "the", "this",
+    "to", "use", "using", "what", "when", "which", "will", "with", "you", "your",
+}
+
+
+def tokenize(text):
+    return [t for t in re.findall(r"[a-z0-9]+", str(text).lower()) if t not in STOPWORDS]
+
+
+def product_documents(product):
+    """Splits one product record into small, independently retrievable snippets."""
+    name = product.get("product_name", "")
+    docs = []
+    for ingredient in product.get("ingredients", []):
+        docs.append({"product": name, "kind": "ingredient", "text": f"Ingredient: {ingredient}"})
+    for claim in product.get("claims", []):
+        docs.append({"product": name, "kind": "claim", "text": f"Claim: {claim}"})
+    if product.get("usage_instructions"):
+        docs.append({"product": name, "kind": "usage", "text": f"Usage: {product['usage_instructions']}"})
+    if product.get("safety_warnings"):
+        docs.append({"product": name, "kind": "safety", "text": f"Safety: {product['safety_warnings']}"})
+    for faq in product.get("faqs_raw", []):
+        docs.append({"product": name, "kind": "faq", "question": faq["q"], "answer": faq["a"],
+                     "text": f"Q: {faq['q']} A: {faq['a']}"})
+    return docs
+
+
+class KnowledgeIndex:
+    def __init__(self, docs, k1=1.5, b=0.75):
+        self.docs = docs
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(dict)  # term -> {doc_id: term frequency}
+        self.lengths = []
+        for doc_id, doc in enumerate(docs):
+            terms = tokenize(doc["text"])
+            self.lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                self.postings[term][doc_id] = tf
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        n = len(docs)
+        self.idf = {term: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)) for term, p in self.postings.items()}
+
+    @classmethod
+    def from_library(cls, library_dir=LIBRARY_DIR):
+        """Indexes every product JSON (any file with a product_name) in the library."""
+        docs = []
+        for path in sorted(glob.glob(os.path.join(library_dir, "*.json"))):
+            with open(path, encoding="utf-8") as f:
+                product = json.load(f)
+            if isinstance(product, dict) and product.get("product_name"):
+                docs.extend(product_documents(product))
+        return cls(docs)
+
+    def search(self, query, k=5, product=None, kinds=None):
+        """Returns up to k (score, doc) pairs ranked by BM25."""
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            for doc_id, tf in self.postings.get(term, {}).items():
+                doc = self.docs[doc_id]
+                if (product and doc["product"] != product) or (kinds and doc["kind"] not in kinds):
+                    continue
+                norm = 1 - self.b + self.b * self.lengths[doc_id] / self.avg_length
+                scores[doc_id] += self.idf[term] * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(score, self.docs[doc_id]) for doc_id, score in ranked]
+
+    def answer(self, question, product=None):
+        """
+        Answer from faqs_raw if a known question matches, else None.
+        Known answers skip the LLM entirely, so the match must be exact on
+        every content term in both directions: "sensitive skin" vs "oily
+        skin" or "suitable" vs "bad" share most terms but need different
+        answers. Near misses still reach the LLM, with the known pair among
+        the grounding snippets.
+        """
+        asked = set(tokenize(question))
+        if not asked:
+            return None
+        for _, doc in self.search(question, k=1, product=product, kinds=("faq",)):
+            if set(tokenize(doc["question"])) == asked:
+                return doc["answer"]
+        return None
+
+    def snippets(self, query, k=5, product=None):
+        """
+        Top-k snippet texts for grounding a prompt. Falls back to the
+        product's usage, safety and claim snippets when nothing matches.
+        """
+        hits = [doc["text"] for _, doc in self.search(query, k=k, product=product)]
+        if hits:
+            return hits
+        general = [doc for kind in ("usage", "safety", "claim") for doc in self.docs
+                   if doc["kind"] == kind and (not product or doc["product"] == product)]
+        return [doc["text"] for doc in general[:k]]
+
+
+@lru_cache(maxsize=4)
+def get_knowledge_index(library_dir=LIBRARY_DIR):
+    """Builds the index once per process."""
+    return KnowledgeIndex.from_library(library_dir)
@@ -0,0 +1,197 @@
+"""
+LLM Backends for Content Generation.
+Providers share one interface so agents never branch on which model (or
+whether any model) is behind a call.
+"""
+import json
+import os
+import time
+from functools import lru_cache
+
+DEFAULT_GEMINI_MODEL = "gemini-flash-latest"
+DEFAULT_OPENAI_MODEL = "gpt-4o-mini"
+LOCAL_RESPONSES_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "library", "simulation_responses.json")
+
+
+class LLMError(Exception):
+    """Raised when a backend cannot produce a response."""
+
+
+class LLMBackend:
+    name = "base"
+    # Offline backends serve canned data; the supervisor plans with rules instead.
+    offline = False
+    # Environment variable holding the API key, if the provider needs one
+    api_key_env = None
+
+    def is_available(self):
+        return True
+
+    def generate(self, prompt, json_mode=False, task=None, mission=None):
+        """
+        Returns the response text for `prompt`. `task` names the call site,
+        `mission` the SharedState.mission_id the call belongs to.
+        """
+        raise NotImplementedError("Backends must implement generate()")
+
+    def prefetch(self, prompt, json_mode=False, task=None, mission=None):
+        """Starts `prompt` ahead of time if supported. Returns True if started."""
+        return False
+
+    def last_latency(self):
+        """
+        Seconds the last generate() on this thread took upstream, when that
+        differs from the caller's wait (a prefetched response); else None.
+        """
+        return None
+
+
+class GeminiBackend(LLMBackend):
+    name = "gemini"
+    api_key_env = "GEMINI_API_KEY"
+
+    def __init__(self, model_name=None):
+        self.model_name = model_name or os.environ.get("GEMINI_MODEL", DEFAULT_GEMINI_MODEL)
+        self._model = None
+        self._api_key = None
+
+    def is_available(self):
+        return bool(os.environ.get(self.api_key_env))
+
+    def _get_model(self):
+        api_key = os.environ.get(self.api_key_env)
+        if not api_key:
+            raise LLMError("No API Key. cannot generate.")
+        if self._model is None or api_key != self._api_key:
+            import google.generativeai as genai
+            genai.configure(api_key=api_key)
+            self._model = genai.GenerativeModel(self.model_name)
+            self._api_key = api_key
+        return self._model
+
+    def generate(self, prompt, json_mode=False, task=None, mission=None):
+        model = self._get_model()
+        generation_config = {}
+        if json_mode:
+            generation_config = {"response_mime_type": "application/json"}
+        response = model.generate_content(prompt, generation_config=generation_config)
+        return response.text
+
+
+class OpenAIBackend(LLMBackend):
+    name = "openai"
+    api_key_env = "OPENAI_API_KEY"
+
+    def __init__(self, model_name=None):
+        self.model_name = model_name or os.environ.get("OPENAI_MODEL", DEFAULT_OPENAI_MODEL)
+        self._client = None
+        self._api_key = None
+
+    def is_available(self):
+        return bool(os.environ.get(self.api_key_env))
+
+    def _get_client(self):
+        api_key = os.environ.get(self.api_key_env)
+        if not api_key:
+            raise LLMError("No API Key. cannot generate.")
+        if self._client is None or api_key != self._api_key:
+            from openai import OpenAI
+            self._client = OpenAI(api_key=api_key)
+            self._api_key = api_key
+        return self._client
+
+    def generate(self, prompt, json_mode=False, task=None, mission=None):
+        client = self._get_client()
+        kwargs = {}
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+        response = client.chat.completions.create(
+            model=self.model_name,
+            messages=[{"role": "user", "content": prompt}],
+            **kwargs,
+        )
+        return response.choices[0].message.content
+
+
+@lru_cache(maxsize=8)
+def _load_local_responses(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class LocalBackend(LLMBackend):
+    """
+    Deterministic offline backend.
+    Serves recorded responses from disk, keyed by task name. Objects are
+    returned as JSON text exactly like a live JSON-mode response.
+    """
+    name = "local"
+    offline = True
+
+    def __init__(self, path=None, latency_ms=None):
+        self.path = path or os.environ.get("LLM_LOCAL_RESPONSES", LOCAL_RESPONSES_PATH)
+        # Optional simulated latency, so load tests see realistic call times
+        self.latency_ms = float(latency_ms if latency_ms is not None else os.environ.get("LLM_LOCAL_LATENCY_MS", "0"))
+
+    def generate(self, prompt, json_mode=False, task=None, mission=None):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        responses = _load_local_responses(self.path)
+        if task not in responses:
+            raise LLMError(f"No recorded response for task '{task}'.")
+        response = responses[task]
+        if isinstance(response, str):
+            return response
+        return json.dumps(response)
+
+
+BACKENDS = {
+    "gemini": GeminiBackend,
+    "openai": OpenAIBackend,
+    "local": LocalBackend,
+}
+
+_instances = {}
+
+
+def resolve_provider(state=None):
+    """Simulation mode always runs offline; otherwise LLM_PROVIDER picks the provider."""
+    if state is not None and state.get_context("simulation_mode"):
+        return "local"
+    return os.environ.get("LLM_PROVIDER", "gemini")
+
+
+def _build_backend(provider):
+    from core.recorder import LLMRecorder, RecordingBackend, ReplayBackend
+
+    if provider == "replay":
+        path = os.environ.get("LLM_REPLAY_PATH")
+        if not path:
+            raise LLMError("LLM_REPLAY_PATH is not set.")
+        scale = float(os.environ.get("LLM_REPLAY_LATENCY_SCALE", "1.0"))
+        backend = ReplayBackend(path, latency_scale=scale)
+    elif provider in BACKENDS:
+        backend = BACKENDS[provider]()
+    else:
+        raise LLMError(f"Unknown LLM provider '{provider}'.")
+
+    hedge = os.environ.get("LLM_HEDGE") == "1"
+    if hedge or os.environ.get("LLM_SPECULATE") == "1":
+        from core.hedging import HedgeBudget, HedgedBackend
+        budget = HedgeBudget(ratio=float(os.environ.get("LLM_HEDGE_BUDGET", "0.1")))
+        percentile = float(os.environ.get("LLM_HEDGE_PERCENTILE", "0.95"))
+        backend = HedgedBackend(backend, hedge=hedge, percentile=percentile, budget=budget)
+
+    # Outermost, so a hedged call is logged once with the winning response
+    record_path = os.environ.get("LLM_RECORD_PATH")
+    if record_path and provider != "replay":
+        backend = RecordingBackend(backend, LLMRecorder(record_path))
+    return backend
+
+
+def get_backend(state=None, provider=None):
+    """Returns the shared backend instance for the resolved provider."""
+    provider = provider or resolve_provider(state)
+    if provider not in _instances:
+        _instances[provider] = _build_backend(provider)
+    return _instances[provider]
@@ -1,45 +1,113 @@
-import json
 import os
-import google.generativeai as genai
+import time
 from core.state import SharedState
+from core.llm import get_backend
+from core.output_parser import parse_json
+
+# Agent most likely to run after each agent, used for speculative prefetch
+SPECULATIVE_NEXT = {
+    "DataAgent": "IdeationAgent",
+    "IdeationAgent": "ContentAgent",
+}
+
+# Supervisor bookkeeping; changes to these do not count as progress
+BOOKKEEPING_KEYS = (
+    "supervisor_phase", "supervisor_next_agent", "supervisor_steps", "agent_failures",
+    "stalled_steps", "speculative_calls", "llm_tokens_used", "mission_started_at",
+)
 
 class ApexSupervisor:
     def __init__(self, state: SharedState):
         self.state = state
         self.agents = {}
+        self._agent_factories = {}
         self.max_steps = 15
+        self.max_agent_failures = 3
+        self.max_stalled_steps = 3
+        self.max_seconds = float(os.environ.get("MISSION_TIME_BUDGET", "600"))
+        self.max_tokens = int(os.environ.get("MISSION_TOKEN_BUDGET", "200000"))
+        self.max_speculative_calls = int(os.environ.get("LLM_SPECULATIVE_BUDGET", "3"))
         
         # Initialize Phase in State
         if not self.state.get_context("supervisor_phase"):
             self.state.update_context("supervisor_phase", "PLANNING")
+            self.state.update_context("mission_started_at", time.time())
         
-        # Initialize Gemini
-        api_key = os.environ.get("GEMINI_API_KEY")
-        if api_key:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-flash-latest')
-        else:
-            self.model = None
+        # Providers load their SDK on the first live planning call
+        self.backend = get_backend(state)
 
     def register_agent(self, name, agent_instance):
         self.agents[name] = agent_instance
 
+    def register_lazy_agent(self, name, factory):
+        """Registers a factory(state) that builds the agent on first dispatch."""
+        self._agent_factories[name] = factory
+
+    def get_agent(self, name):
+        if name not in self.agents and name in self._agent_factories:
+            self.agents[name] = self._agent_factories[name](self.state)
+        return self.agents.get(name)
+
+    def speculate_after(self, agent_name):
+        """
+        Starts the likely next agent's prompts while the planner decides.
+        Spends at most max_speculative_calls per mission.
+        """
+        next_agent = self.get_agent(SPECULATIVE_NEXT.get(agent_name))
+        if not next_agent:
+            return
+        used = self.state.get_context("speculative_calls") or 0
+        try:
+            prompts = next_agent.speculative_prompts()
+        except Exception:
+            return
+        for prompt, json_mode, task in prompts:
+            if used >= self.max_speculative_calls:
+                break
+            if self.backend.prefetch(prompt, json_mode=json_mode, task=task, mission=self.state.mission_id):
+                used += 1
+        if used:
+            self.state.update_context("speculative_calls", used)
+
+    def check_budget(self):
+        """Returns why the mission must stop, or None while within budget."""
+        steps = self.state.get_context("supervisor_steps") or 0
+        if steps >= self.max_steps:
+            return f"Step budget exhausted ({steps}/{self.max_steps})."
+        started = self.state.get_context("mission_started_at")
+        if started and time.time() - started > self.max_seconds:
+            return f"Time budget exhausted ({self.max_seconds:.0f}s)."
+        tokens = self.state.get_context("llm_tokens_used") or 0
+        if tokens > self.max_tokens:
+            return f"Token budget exhausted (~{tokens}/{self.max_tokens})."
+        if (self.state.get_context("stalled_steps") or 0) >= self.max_stalled_steps:
+            return "No progress in recent steps."
+        # Checked before planning so a doomed mission never spends a planner call
+        for name, failures in (self.state.get_context("agent_failures") or {}).items():
+            if failures >= self.max_agent_failures:
+                return f"{name} made no progress {failures} times; giving up."
+        return None
+
+    def stop(self, reason):
+        self.state.set_error(f"Supervisor: {reason}")
+        return False
+
     def determine_next_step(self):
-        # --- SIMULATION MODE LOGIC ---
-        if self.state.get_context("simulation_mode"):
+        # --- OFFLINE (RULE-BASED) PLANNING ---
+        if self.backend.offline:
             if not self.state.get_context("glowboost_data") or not self.state.get_context("competitor_data"):
-                return {"next_action": "DataAgent", "reason": "[Sim] Ingesting data..."}
+                return {"next_action": "DataAgent", "reason": "[Offline] Ingesting data..."}
             if not self.state.get_context("structured_faqs"):
-                return {"next_action": "IdeationAgent", "reason": "[Sim] Generating FAQs..."}
+                return {"next_action": "IdeationAgent", "reason": "[Offline] Generating FAQs..."}
             artifacts = self.state.get_all()["artifacts"]
             if "faq.json" not in artifacts or "product_page.json" not in artifacts:
-                return {"next_action": "ContentAgent", "reason": "[Sim] Constructing artifacts..."}
+                return {"next_action": "ContentAgent", "reason": "[Offline] Constructing artifacts..."}
             if not self.state.get_context("validation_report"):
-                return {"next_action": "ValidatorAgent", "reason": "[Sim] Validating outputs..."}
-            return {"next_action": "FINISH", "reason": "[Sim] Mission Complete."}
+                return {"next_action": "ValidatorAgent", "reason": "[Offline] Validating outputs..."}
+            return {"next_action": "FINISH", "reason": "[Offline] Mission Complete."}
 
-        # --- GEMINI LOGIC ---
-        if not self.model:
+        # --- LLM PLANNING ---
+        if not self.backend.is_available():
             return {"next_action": "ERROR", "reason": "No API Key"}
 
         context_keys = list(self.state._state["context"].keys())
@@ -66,20 +134,27 @@ class ApexSupervisor:
         """
 
         try:
-            response = self.model.generate_content(prompt, generation_config={"response_mime_type": "application/json"})
-            text = response.text.replace("```json", "").replace("```", "").strip()
-            return json.loads(text)
+            response = self.backend.generate(prompt, json_mode=True, task="plan", mission=self.state.mission_id)
+            self.state.record_llm_usage(prompt, response)
+            plan = parse_json(response)
+            if not isinstance(plan, dict):
+                raise ValueError("Planner did not return a JSON object")
+            return plan
         except Exception as e:
             error_msg = str(e)
             if "429" in error_msg:
                 self.state.log_event("Supervisor", "🛑 Quota Limit Hit. Wait 60s.")
-            self.state.log_event("Supervisor", f"Planning Error: {error_msg}")
+            self.state.set_error(f"Supervisor: Planning Error: {error_msg}")
             return {"next_action": "FINISH", "reason": "Error during planning"}
 
     def run_step(self):
         phase = self.state.get_context("supervisor_phase")
         
         if phase == "PLANNING":
+            reason = self.check_budget()
+            if reason:
+                return self.stop(reason)
+
             plan = self.determine_next_step()
             next_agent_name = plan.get("next_action")
             next_reason = plan.get("reason")
@@ -90,7 +165,7 @@ class ApexSupervisor:
                 return False
             
             if next_agent_name == "ERROR":
-                self.state.set_error("Supervisor: Missing Gemini API Key.")
+                self.state.set_error(f"Supervisor: Missing API Key for {self.backend.name}.")
                 return False
                 
             self.state.update_context("supervisor_phase", "EXECUTION")
@@ -99,14 +174,28 @@ class ApexSupervisor:
 
         elif phase == "EXECUTION":
             next_agent_name = self.state.get_context("supervisor_next_agent")
-            agent = self.agents.get(next_agent_name)
+            agent = self.get_agent(next_agent_name)
             
+            # Agents skip sub-tasks that are already done, so a re-dispatch
+            # only retries the piece that failed last time.
+            before = self.state.fingerprint(exclude=BOOKKEEPING_KEYS)
             if agent:
                 try:
                     agent.execute()
                 except Exception as e:
                     self.state.set_error(f"Agent {next_agent_name} crashed: {e}")
+
+            self.state.update_context("supervisor_steps", (self.state.get_context("supervisor_steps") or 0) + 1)
+            if self.state.fingerprint(exclude=BOOKKEEPING_KEYS) == before:
+                self.state.log_event("Supervisor", f"{next_agent_name} made no progress.")
+                self.state.update_context("stalled_steps", (self.state.get_context("stalled_steps") or 0) + 1)
+                failures = dict(self.state.get_context("agent_failures") or {})
+                failures[next_agent_name] = failures.get(next_agent_name, 0) + 1
+                self.state.update_context("agent_failures", failures)
+            else:
+                self.state.update_context("stalled_steps", 0)
             
+            self.speculate_after(next_agent_name)
             self.state.update_context("supervisor_phase", "PLANNING")
             self.state.update_context("supervisor_next_agent", None)
             return True
@@ -0,0 +1,153 @@
+"""
+Output Parser for LLM Responses.
+Turns raw model text into JSON: a fast-path parse first, then extraction of
+the first balanced JSON value from noisy text, then repair of common defects
+(trailing commas, single quotes, Python literals, truncated tails).
+"""
+import json
+
+try:
+    import orjson
+
+    def _loads(text):
+        return orjson.loads(text)
+except ImportError:  # orjson is optional
+    def _loads(text):
+        return json.loads(text)
+
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+class OutputParseError(ValueError):
+    """Raised when a response cannot be turned into JSON."""
+
+
+def strip_code_fences(text):
+    """Removes a surrounding ```json ... ``` fence, if present."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else text[3:]
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    return text.strip()
+
+
+def extract_json_block(text):
+    """
+    Returns the first balanced {...} or [...] in `text`, respecting strings.
+    If the value never closes (a truncated response), returns everything
+    from its opening bracket onward.
+    """
+    start = next((i for i, ch in enumerate(text) if ch in "{["), None)
+    if start is None:
+        raise OutputParseError("No JSON object found in response.")
+    depth = 0
+    quote = None
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if quote:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return text[start:]
+
+
+def repair_json(text):
+    """
+    Rewrites near-JSON into JSON: single-quoted strings become double-quoted,
+    Python literals become JSON ones, trailing commas are dropped, and an
+    unterminated string or unclosed brackets are closed.
+    """
+    out = []
+    stack = []
+    quote = None
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if quote:
+            if ch == "\\" and i + 1 < len(text):
+                nxt = text[i + 1]
+                # \' is only meaningful inside single-quoted strings
+                out.append(nxt if (nxt == "'" and quote == "'") else ch + nxt)
+                i += 2
+                continue
+            if ch == quote:
+                out.append('"')
+                quote = None
+            elif ch == '"':
+                out.append('\\"')
+            elif ch == "\n":
+                out.append("\\n")
+            else:
+                out.append(ch)
+        elif ch in "\"'":
+            quote = ch
+            out.append('"')
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            out.append(ch)
+        elif ch in "}]":
+            _drop_trailing_comma(out)
+            if stack:
+                stack.pop()
+            out.append(ch)
+        elif ch.isalpha():
+            j = i
+            while j < len(text) and (text[j].isalnum() or text[j] == "_"):
+                j += 1
+            word = text[i:j]
+            out.append(_PY_LITERALS.get(word, word))
+            i = j
+            continue
+        else:
+            out.append(ch)
+        i += 1
+
+    # Truncated tail: close the open string, drop a dangling separator, close brackets
+    if quote:
+        out.append('"')
+    _drop_trailing_comma(out)
+    if "".join(out).rstrip().endswith(":"):
+        out.append(" null")
+    while stack:
+        out.append(stack.pop())
+    return "".join(out)
+
+
+def _drop_trailing_comma(out):
+    j = len(out) - 1
+    while j >= 0 and out[j].isspace():
+        j -= 1
+    if j >= 0 and out[j] == ",":
+        del out[j]
+
+
+def parse_json(text):
+    """Parses a model response into a Python value, repairing it if needed."""
+    if text is None:
+        raise OutputParseError("Empty response.")
+    try:
+        return _loads(text)
+    except ValueError:
+        pass
+    block = extract_json_block(strip_code_fences(text))
+    try:
+        return _loads(block)
+    except ValueError:
+        pass
+    try:
+        return _loads(repair_json(block))
+    except ValueError as e:
+        raise OutputParseError(f"Unrepairable JSON: {e}") from e
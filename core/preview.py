@@ -0,0 +1,111 @@
+"""
+Product Page Preview Renderer.
+The preview HTML is a Jinja template compiled once per process; rendering a
+product page is then a cheap, auto-escaped substitution.
+"""
+from functools import lru_cache
+
+PRODUCT_PREVIEW_TEMPLATE = """
+<html>
+<head>
+<style>
+    @import url('https://fonts.googleapis.com/css2?family=Outfit:wght@300;500;700&display=swap');
+    body {
+        font-family: 'Outfit', sans-serif;
+        background-color: #151515;
+        color: #EEE;
+        padding: 2rem;
+        margin: 0;
+    }
+    .container {
+        max-width: 1000px;
+        margin: 0 auto;
+        border: 1px solid #333;
+        border-radius: 12px;
+        background: #151515;
+        padding: 3rem;
+        box-shadow: 0 10px 30px rgba(0,0,0,0.5);
+    }
+    h1 { color: #FF8800; font-size: 3rem; margin: 0.5rem 0; letter-spacing: -1px; }
+    h2 { color: #FFF; font-size: 3.5rem; margin: 1.5rem 0; line-height: 1.2; }
+    h3 { color: #FF8800; margin-top: 0; }
+    .btn {
+        display: inline-block;
+        background: #FF8800;
+        color: #000;
+        padding: 15px 40px;
+        border-radius: 50px;
+        font-size: 1.2rem;
+        font-weight: 800;
+        cursor: pointer;
+        box-shadow: 0 0 20px rgba(255,136,0,0.4);
+        text-decoration: none;
+    }
+    .grid {
+        display: grid;
+        grid-template-columns: 1fr 1fr;
+        gap: 3rem;
+        margin-top: 2rem;
+    }
+    .card {
+        background: #202020;
+        padding: 2rem;
+        border-radius: 12px;
+        border: 1px solid #333;
+    }
+    ul { line-height: 1.8; color: #DDD; padding-left: 1.2rem; }
+    strong { color: #FFF; }
+</style>
+</head>
+<body>
+    <div class="container">
+        <div style="text-align: center; border-bottom: 1px solid #333; padding-bottom: 2rem; margin-bottom: 2rem;">
+            <div style="font-size: 0.9rem; text-transform: uppercase; letter-spacing: 2px; color: #888; margin-bottom: 1rem;">Official Store</div>
+            <h1>{{ meta.title }}</h1>
+            <p style="color: #AAA; font-size: 1.2rem; max-width: 600px; margin: 0 auto;">{{ meta.description }}</p>
+        </div>
+
+        <div style="text-align: center; margin-bottom: 4rem;">
+            <h2>{{ hero.headline }}</h2>
+            <a class="btn">
+                {{ hero.call_to_action or "Buy Now" }} — ${{ specs.price }}
+            </a>
+        </div>
+
+        <div class="grid">
+            <div class="card">
+                <h3>✨ Key Benefits</h3>
+                <ul>
+                    {% for item in hero.key_benefits or [] %}<li>{{ item }}</li>{% endfor %}
+                </ul>
+            </div>
+            <div class="card">
+                <h3>🔬 Specifications</h3>
+                <p style="margin-bottom: 1rem;"><strong>Volume:</strong> <span style="color: #AAA;">{{ specs.volume }}</span></p>
+                <div>
+                    <strong>Ingredients:</strong>
+                    <div style="margin-top: 0.5rem; color: #AAA; font-size: 0.95rem; line-height: 1.6;">
+                        {{ (specs.ingredients or []) | join(", ") }}
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+
+@lru_cache(maxsize=1)
+def _product_preview_template():
+    from jinja2 import Environment
+    return Environment(autoescape=True).from_string(PRODUCT_PREVIEW_TEMPLATE)
+
+
+def render_product_preview(product_page):
+    """Renders the preview HTML for a product_page.json artifact."""
+    return _product_preview_template().render(
+        meta=product_page.get("meta") or {},
+        hero=product_page.get("hero_section") or {},
+        specs=product_page.get("specifications") or {},
+    )
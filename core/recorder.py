@@ -0,0 +1,148 @@
+"""
+Record & Replay for LLM traffic.
+Every exchange is appended to a gzip-compressed JSONL log so a production
+mission can be rerun offline, with the original (or scaled) latency.
+"""
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from core.llm import LLMBackend, LLMError
+
+
+def prompt_hash(prompt, json_mode=False):
+    """Stable key for a request: the prompt text plus the response mode."""
+    key = f"{int(bool(json_mode))}\n{prompt}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class LLMRecorder:
+    """
+    Append-only, gzip-compressed JSONL log.
+    Each record is written as its own gzip member, so the file stays readable
+    even if the process dies mid-mission.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, task, provider, prompt, json_mode, response, latency, error=None):
+        entry = {
+            "ts": time.time(),
+            "task": task,
+            "provider": provider,
+            "prompt_hash": prompt_hash(prompt, json_mode),
+            "json_mode": bool(json_mode),
+            "prompt": prompt,
+            "response": response,
+            "latency_ms": round(latency * 1000, 2),
+            "error": error,
+        }
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            with gzip.open(self.path, "ab") as f:
+                f.write(line)
+
+
+def read_records(path):
+    """Yields recorded exchanges in the order they were written."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class RecordingBackend(LLMBackend):
+    """
+    Wraps another backend and logs every exchange, including failures.
+    Sits outside HedgedBackend, so only the response the caller got is
+    logged, never the losing duplicate or an unused prefetch.
+    """
+
+    def __init__(self, inner, recorder):
+        self.inner = inner
+        self.recorder = recorder
+        self.name = inner.name
+        self.offline = inner.offline
+        self.api_key_env = inner.api_key_env
+
+    def is_available(self):
+        return self.inner.is_available()
+
+    def generate(self, prompt, json_mode=False, task=None, mission=None):
+        start = time.perf_counter()
+        try:
+            response = self.inner.generate(prompt, json_mode=json_mode, task=task, mission=mission)
+        except Exception as e:
+            self.recorder.record(task, self.inner.name, prompt, json_mode, None, time.perf_counter() - start, error=str(e))
+            raise
+        # A consumed prefetch returns instantly; log the call's real duration
+        # so replays at LLM_REPLAY_LATENCY_SCALE=1.0 keep the original timing.
+        latency = self.inner.last_latency()
+        if latency is None:
+            latency = time.perf_counter() - start
+        self.recorder.record(task, self.inner.name, prompt, json_mode, response, latency)
+        return response
+
+    def last_latency(self):
+        return self.inner.last_latency()
+
+    def prefetch(self, prompt, json_mode=False, task=None, mission=None):
+        # Recorded when (and if) generate() consumes it
+        return self.inner.prefetch(prompt, json_mode=json_mode, task=task, mission=mission)
+
+
+class ReplayBackend(LLMBackend):
+    """
+    Serves responses from a recorded log.
+    Requests are matched on prompt hash first; prompts that embed volatile
+    data (timestamps in the planner's log excerpt) fall back to the next
+    unserved record for the same task, in recorded order.
+    Each mission keeps its own cursor over the log, so one instance can
+    replay the recording any number of times, including concurrently.
+    latency_scale=1.0 reproduces the original timing, 0 replays at full speed.
+    """
+    name = "replay"
+
+    def __init__(self, path, latency_scale=1.0, max_missions=256):
+        self.path = path
+        self.latency_scale = latency_scale
+        self.max_missions = max_missions
+        self._lock = threading.Lock()
+        self._records = list(read_records(path))
+        self._by_hash = defaultdict(list)
+        self._by_task = defaultdict(list)
+        for i, entry in enumerate(self._records):
+            self._by_hash[entry["prompt_hash"]].append(i)
+            self._by_task[entry["task"]].append(i)
+        # Recordings made in Simulation Mode have no planner calls; replay
+        # those with the rule-based planner, like the original run.
+        self.offline = "plan" not in self._by_task
+        self._served = OrderedDict()  # mission -> indices already served
+
+    def _take(self, prompt, json_mode, task, mission):
+        with self._lock:
+            served = self._served.setdefault(mission, set())
+            self._served.move_to_end(mission)
+            while len(self._served) > self.max_missions:
+                self._served.popitem(last=False)
+            for index in (self._by_hash.get(prompt_hash(prompt, json_mode), ()), self._by_task.get(task, ())):
+                for i in index:
+                    if i not in served:
+                        served.add(i)
+                        return self._records[i]
+            return None
+
+    def generate(self, prompt, json_mode=False, task=None, mission=None):
+        entry = self._take(prompt, json_mode, task, mission)
+        if entry is None:
+            raise LLMError(f"No recorded response for task '{task}'.")
+        if self.latency_scale:
+            time.sleep(entry["latency_ms"] / 1000 * self.latency_scale)
+        if entry["error"]:
+            raise LLMError(entry["error"])
+        return entry["response"]
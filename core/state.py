@@ -1,4 +1,6 @@
+import hashlib
 import json
+import uuid
 from datetime import datetime
 
 class SharedState:
@@ -10,6 +12,10 @@ class SharedState:
             "status": "initialized",
             "errors": []
         }
+        # Identifies this mission to shared backends (replay cursors, prefetches)
+        self.mission_id = uuid.uuid4().hex
+        self._artifact_listeners = []
+        self._artifact_fingerprints = {}
     
     def update_context(self, key, value):
         self._state["context"][key] = value
@@ -17,7 +23,20 @@ class SharedState:
 
     def save_artifact(self, key, value):
         self._state["artifacts"][key] = value
+        self._artifact_fingerprints[key] = hashlib.sha256(
+            json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
         self.log_event("system", f"Saved artifact: {key}")
+        for listener in self._artifact_listeners:
+            # A failing listener (e.g. a full disk) must not lose the artifact
+            try:
+                listener(key, value)
+            except Exception as e:
+                self.set_error(f"Artifact listener failed for {key}: {e}")
+
+    def add_artifact_listener(self, callback):
+        """Registers callback(key, value), called on every saved artifact."""
+        self._artifact_listeners.append(callback)
 
     def get_context(self, key):
         return self._state["context"].get(key)
@@ -25,9 +44,25 @@ class SharedState:
     def get_artifact(self, key):
         return self._state["artifacts"].get(key)
     
+    def artifact_fingerprint(self, key):
+        """Content hash of an artifact, computed once when it is saved."""
+        return self._artifact_fingerprints.get(key)
+
     def get_all(self):
         return self._state
     
+    def record_llm_usage(self, prompt, response):
+        """Adds a rough token estimate (~4 chars/token) for one LLM exchange."""
+        tokens = (len(prompt or "") + len(response or "")) // 4
+        context = self._state["context"]
+        context["llm_tokens_used"] = context.get("llm_tokens_used", 0) + tokens
+
+    def fingerprint(self, exclude=()):
+        """Hash of context and artifacts, used to detect steps that changed nothing."""
+        context = {k: v for k, v in self._state["context"].items() if k not in exclude}
+        payload = json.dumps([context, self._artifact_fingerprints], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
     def log_event(self, source, message):
         timestamp = datetime.now().strftime("%H:%M:%S")
         entry = {
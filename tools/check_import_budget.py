@@ -0,0 +1,60 @@
+"""
+Import-Time Budget Check.
+Imports the modules app.py loads at startup plus every registered agent, and
+fails if an LLM SDK was pulled in or if importing took longer than the budget.
+Must run in a fresh interpreter, so it is a script rather than an import.
+
+Usage:
+    python tools/check_import_budget.py               # default 300 ms budget
+    python tools/check_import_budget.py --budget-ms 150
+"""
+import argparse
+import importlib
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules app.py imports at top level (Streamlit itself is excluded)
+STARTUP_MODULES = [
+    "core.state",
+    "core.orchestrator",
+    "core.llm",
+    "core.exporter",
+    "core.preview",
+    "agents",
+]
+HEAVY_MODULES = ["google.generativeai", "openai"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check startup imports stay lazy and fast")
+    parser.add_argument("--budget-ms", type=float, default=300, help="Maximum import time in milliseconds")
+    args = parser.parse_args()
+    sys.path.insert(0, ROOT)
+
+    started = time.perf_counter()
+    for name in STARTUP_MODULES:
+        importlib.import_module(name)
+    # Loading every agent class must not pull in an SDK either
+    from agents import AGENT_REGISTRY, load_agent_class
+    for name in AGENT_REGISTRY:
+        load_agent_class(name)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    failures = []
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+    if loaded:
+        failures.append(f"Heavy SDKs imported at startup: {', '.join(loaded)}")
+    if elapsed_ms > args.budget_ms:
+        failures.append(f"Import time {elapsed_ms:.1f} ms exceeds budget of {args.budget_ms:.0f} ms")
+
+    print(f"Startup imports: {elapsed_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
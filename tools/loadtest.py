@@ -0,0 +1,198 @@
+"""
+Load Test Harness.
+Drives N concurrent headless sessions of app.py (Streamlit AppTest, one
+script thread each, like a real server) in Simulation Mode against the
+local fake LLM backend, and reports per-session memory, reruns/second,
+time-to-mission-complete under contention and server CPU.
+
+Usage:
+    python tools/loadtest.py --sessions 20 --llm-latency-ms 800 --step-delay 1.0
+    python tools/loadtest.py --sessions 50 --max-p95 30   # exit 1 on regression
+"""
+import argparse
+import contextlib
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+# shared_runtime() patches AppTest internals of this release (see requirements-dev.txt)
+SUPPORTED_STREAMLIT = "1.66."
+
+
+def rss_mb():
+    """Current resident set size of this (server) process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # Not Linux: fall back to peak RSS (KB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct * len(ordered)))] if ordered else 0.0
+
+
+@contextlib.contextmanager
+def shared_runtime():
+    """
+    One Runtime for every session, as in a real server.
+    AppTest swaps a fresh mock into the process-global Runtime singleton on
+    each run and clears it afterwards, which breaks concurrent sessions. We
+    point AppTest at a throwaway subclass so those swaps land there, and
+    install a single shared runtime (one media manager, one st.cache_data
+    store) on the real class for the duration of the test. Sessions also
+    share one ScriptCache, so app.py is compiled once like on a server.
+    This relies on AppTest internals, so the Streamlit version is pinned in
+    requirements-dev.txt and checked here before anything is patched.
+    """
+    from unittest.mock import MagicMock
+
+    import streamlit
+    from streamlit.runtime import Runtime
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    if not streamlit.__version__.startswith(SUPPORTED_STREAMLIT):
+        raise SystemExit(
+            f"tools/loadtest.py supports Streamlit {SUPPORTED_STREAMLIT}.x (pinned in requirements-dev.txt), "
+            f"found {streamlit.__version__}; update shared_runtime() for the new AppTest internals."
+        )
+    required = [
+        (app_test, "Runtime"), (app_test, "ScriptCache"), (app_test, "MediaFileManager"),
+        (app_test, "MemoryMediaFileStorage"), (app_test, "MemoryCacheStorageManager"),
+        (local_script_runner, "ScriptCache"), (Runtime, "_instance"),
+    ]
+    missing = [f"{owner.__name__}.{attr}" for owner, attr in required if not hasattr(owner, attr)]
+    if missing:
+        raise SystemExit(f"Streamlit internals used by shared_runtime() are missing: {', '.join(missing)}")
+
+    # Built from the same classes AppTest uses for its per-run mock
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = app_test.MediaFileManager(app_test.MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = app_test.MemoryCacheStorageManager()
+    if hasattr(app_test, "DataframeSourceManager"):
+        runtime.dataframe_source_mgr = app_test.DataframeSourceManager()
+
+    class _PerRunRuntime(Runtime):
+        _instance = None
+
+    script_cache = app_test.ScriptCache()
+    originals = (app_test.Runtime, app_test.ScriptCache, local_script_runner.ScriptCache)
+    app_test.Runtime = _PerRunRuntime
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+    Runtime._instance = runtime
+    try:
+        yield runtime
+    finally:
+        app_test.Runtime, app_test.ScriptCache, local_script_runner.ScriptCache = originals
+        Runtime._instance = None
+
+
+def run_session(session_id, timeout, results):
+    from streamlit.testing.v1 import AppTest
+
+    result = {"session": session_id, "ok": False}
+    try:
+        at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        at.run()
+        at.toggle[0].set_value(True).run()
+        runs_before = at.session_state["script_runs"]
+        started = time.perf_counter()
+        # One click runs the whole mission: each supervisor step is one rerun
+        at.button[0].click().run()
+        result["mission_seconds"] = time.perf_counter() - started
+
+        state = at.session_state["shared_state"]
+        result["reruns"] = at.session_state["script_runs"] - runs_before  # Counted by app.py itself
+        result["validation"] = state.get_context("validation_report")
+        result["errors"] = list(state.get_all()["errors"])
+        result["exceptions"] = [e.value for e in at.exception]
+        result["ok"] = result["validation"] == "PASS" and not result["exceptions"]
+        results[session_id] = (result, at)  # Keep sessions alive until memory is sampled
+    except Exception as e:
+        result["exceptions"] = [repr(e)]
+        results[session_id] = (result, None)
+
+
+def run_load_test(sessions, timeout):
+    # Warm-up session: imports Streamlit, the app modules and process-wide
+    # caches once, so the measurements below only reflect per-session cost.
+    run_session("warmup", timeout, {})
+
+    results = {}
+    rss_before = rss_mb()
+    cpu_before = time.process_time()
+    wall_before = time.perf_counter()
+
+    threads = [threading.Thread(target=run_session, args=(i, timeout, results)) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    wall = time.perf_counter() - wall_before
+    cpu = time.process_time() - cpu_before
+    rss_after = rss_mb()
+
+    per_session = [results[i][0] for i in sorted(results)]
+    completed = [r for r in per_session if r["ok"]]
+    mission_times = [r["mission_seconds"] for r in completed]
+    total_reruns = sum(r.get("reruns", 0) for r in per_session)
+    return {
+        "sessions": sessions,
+        "completed": len(completed),
+        "failed": [r for r in per_session if not r["ok"]],
+        "wall_seconds": round(wall, 2),
+        "mission_seconds_p50": round(statistics.median(mission_times), 2) if mission_times else None,
+        "mission_seconds_p95": round(percentile(mission_times, 0.95), 2) if mission_times else None,
+        "mission_seconds_max": round(max(mission_times), 2) if mission_times else None,
+        "reruns_per_second": round(total_reruns / wall, 2) if wall else None,
+        "server_cpu_percent": round(100 * cpu / wall, 1) if wall else None,
+        "rss_mb_before": round(rss_before, 1),
+        "rss_mb_after": round(rss_after, 1),
+        "memory_mb_per_session": round((rss_after - rss_before) / sessions, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent session load test for app.py")
+    parser.add_argument("--sessions", type=int, default=10, help="Concurrent headless sessions")
+    parser.add_argument("--step-delay", type=float, default=1.0, help="APEX_STEP_DELAY: pause per rerun (app default 1.0s)")
+    parser.add_argument("--llm-latency-ms", type=float, default=0, help="Simulated latency of each fake LLM call")
+    parser.add_argument("--timeout", type=float, default=300, help="Per-session timeout in seconds")
+    parser.add_argument("--max-p95", type=float, default=None, help="Fail if p95 mission time exceeds this (seconds)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    # The fake backend and exporter are configured through the same env vars the app reads
+    os.environ["APEX_STEP_DELAY"] = str(args.step_delay)
+    os.environ["LLM_LOCAL_LATENCY_MS"] = str(args.llm_latency_ms)
+    os.environ.setdefault("EXPORT_DIR", tempfile.mkdtemp(prefix="apex-loadtest-"))
+    sys.path.insert(0, ROOT)
+
+    with shared_runtime():
+        report = run_load_test(args.sessions, args.timeout)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for key, value in report.items():
+            if key != "failed":
+                print(f"{key:>24}: {value}")
+        for failure in report["failed"]:
+            print(f"  session {failure['session']} failed: {failure.get('exceptions') or failure.get('errors')}")
+
+    regressed = args.max_p95 is not None and (report["mission_seconds_p95"] or float("inf")) > args.max_p95
+    sys.exit(1 if report["failed"] or regressed else 0)
+
+
+if __name__ == "__main__":
+    main()